@@ -1,25 +1,45 @@
 import os
+import sys
 import json
+import functools
 import webbrowser
 import speech_recognition as sr
-import pyttsx3
-from vosk import Model, KaldiRecognizer, SetLogLevel
-from fuzzywuzzy import process
 import subprocess
 import platform
 import time
+import threading
+import queue
+import concurrent.futures
+import importlib.util
+import array
+import math
 import urllib.parse
+import re
+import logging
+
+# audioop left the stdlib in Python 3.13 (pip install audioop-lts brings it back)
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+log = logging.getLogger("siri")
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+_SYSTEM = platform.system()
 
 WAKE_WORD = "siri" 
 
 # Listening modes
 CONTINUOUS_MODE = False  # Set to True for always listening, False for push-to-talk
 SILENCE_TIMEOUT = 2.0    # Seconds of silence before stopping listening
+VOSK_BLOCK_SIZE = 3200   # Frames per streamed block (200 ms at 16 kHz)
+AUDIO_QUEUE_SIZE = 50    # Captured blocks buffered between capture and recognition (~10 s)
+MIC_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".siri_cache", "mic.json")
 
 # Platform-specific app commands
 def get_app_map():
-    system = platform.system()
-    if system == "Darwin":  # macOS
+    if _SYSTEM == "Darwin":  # macOS
         return {
             "chrome": "Google Chrome",
             "spotify": "Spotify", 
@@ -28,7 +48,7 @@ def get_app_map():
             "code": "Visual Studio Code",
             "terminal": "Terminal"
         }
-    elif system == "Windows":
+    elif _SYSTEM == "Windows":
         return {
             "chrome": "chrome.exe",
             "spotify": "Spotify.exe",
@@ -80,43 +100,168 @@ SEARCH_PATTERNS = {
     "netflix": "https://www.netflix.com/search?q="
 }
 
+# Fuzzy match candidates, built once so the dict views aren't reconverted per call
+_APP_KEYS = tuple(APP_MAP.keys())
+_WEB_KEYS = tuple(WEB_DEFAULTS.keys())
+
+SEARCH_KEYWORDS = ["play", "search", "find", "look for", "show me", "watch", "listen to", "listen"]
+SHUTDOWN_KEYWORDS = ["shutdown", "stop", "quit", "exit", "bye", "goodbye", "sleep"]
+_OPEN_VERBS = frozenset({"open", "play", "search", "find", "watch", "listen", "launch", "start"})
+
+def _keyword_re(words):
+    """Compile a whole-word alternation, longest first (prefer "stackoverflow" over "stack")"""
+    return re.compile(r'\b(' + '|'.join(map(re.escape, sorted(words, key=len, reverse=True))) + r')\b')
+
+# One regex pass per command instead of a Python substring scan per keyword
+_OPEN_TARGETS_RE = _keyword_re(list(APP_MAP) + list(WEB_DEFAULTS))
+_SEARCH_RE = _keyword_re(SEARCH_KEYWORDS)
+_SHUTDOWN_RE = _keyword_re(SHUTDOWN_KEYWORDS)
+
+# Filler words stripped from search queries in a single pass
+_STOPWORDS = SEARCH_KEYWORDS + ["open", "launch", "start", "please", WAKE_WORD, "and", "for", "some", "a", "the"]
+_STRIP_RE = _keyword_re(_STOPWORDS)
+_WS_RE = re.compile(r'\s+')
+
 VOSK_MODEL_PATH = "vosk-model-small-en-us-0.15"
-CUSTOM_VOCAB = list(APP_MAP.keys()) + ["youtube", "gmail", "google", "facebook", "twitter", "netflix", "amazon", "reddit", "spotify"] + ["open", "siri", "launch", "start", "shutdown", "stop", "help", "play", "search", "find", "watch", "listen"]
+# Everything the command phase can act on, plus the fillers people say between keywords
+CUSTOM_VOCAB = list(dict.fromkeys(
+    list(_APP_KEYS) + list(_WEB_KEYS) + SEARCH_KEYWORDS + sorted(_OPEN_VERBS) + SHUTDOWN_KEYWORDS
+    + [WAKE_WORD, "help", "and", "for"]
+))
+GRAMMAR = json.dumps(CUSTOM_VOCAB + ["[unk]"])
+# Out-of-grammar words come back as literal "[unk]" tokens
+_UNK_RE = re.compile(r'(?:\s*\[unk\])+\s*')
 
-engine = pyttsx3.init()
-try:
-    # Get available voices
-    voices = engine.getProperty('voices')
-    if voices:
-        # Try to set a good voice (prefer female voice for Siri)
-        for voice in voices:
-            if 'female' in voice.name.lower() or 'samantha' in voice.name.lower():
-                engine.setProperty('voice', voice.id)
-                break
-        else:
-            # If no female voice, use the first available
-            engine.setProperty('voice', voices[0].id)
+# Decoder settings tuned for short, real-time commands (smaller beam = faster decode)
+VOSK_TUNED_CONF = {
+    "--max-active": "3000",
+    "--beam": "10.0",
+    "--lattice-beam": "2.0",
+}
+
+# Heavy native modules (pyttsx3, vosk, sounddevice, rapidfuzz) are imported on first use
+# (vosk in a background thread, see _vosk_loader) so that "test"/"speech" runs and the
+# web server start quickly
+_engine = None
+
+def _get_engine():
+    """Create and configure the TTS engine on first use"""
+    global _engine
+    if _engine is not None:
+        return _engine
+    
+    import pyttsx3
+    engine = pyttsx3.init()
+    try:
+        # Get available voices
+        voices = engine.getProperty('voices')
+        if voices:
+            # Try to set a good voice (prefer female voice for Siri)
+            for voice in voices:
+                if 'female' in voice.name.lower() or 'samantha' in voice.name.lower():
+                    engine.setProperty('voice', voice.id)
+                    break
+            else:
+                # If no female voice, use the first available
+                engine.setProperty('voice', voices[0].id)
+        
+        # Set speech properties
+        engine.setProperty('rate', 180)  # Slightly faster
+        engine.setProperty('volume', 0.9)  # Louder
+        
+        log.info("TTS engine initialized successfully")
+        
+    except Exception as e:
+        log.warning("TTS setup issue: %s", e)
+        engine.setProperty('rate', 175)
+        engine.setProperty('volume', 1.0)
+    
+    _engine = engine
+    return _engine
+
+def tune_vosk_model_conf(model_path):
+    """Make sure the model's conf/model.conf uses the tuned beam settings"""
+    conf_path = os.path.join(model_path, "conf", "model.conf")
+    try:
+        with open(conf_path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        # Older model layouts have no model.conf - leave them untouched
+        log.debug("No model.conf at %s, skipping decoder tuning", conf_path)
+        return
+    
+    settings = {}
+    for line in lines:
+        key, _, value = line.strip().partition("=")
+        if key:
+            settings[key] = value
+    
+    if all(settings.get(key) == value for key, value in VOSK_TUNED_CONF.items()):
+        return
+    
+    # Rewrite existing keys in place and append any missing ones
+    tuned = []
+    for line in lines:
+        key = line.strip().partition("=")[0]
+        tuned.append(f"{key}={VOSK_TUNED_CONF[key]}" if key in VOSK_TUNED_CONF else line)
+    for key, value in VOSK_TUNED_CONF.items():
+        if key not in settings:
+            tuned.append(f"{key}={value}")
     
-    # Set speech properties
-    engine.setProperty('rate', 180)  # Slightly faster
-    engine.setProperty('volume', 0.9)  # Louder
+    try:
+        with open(conf_path, "w") as f:
+            f.write("\n".join(tuned) + "\n")
+        log.info("Tuned Vosk decoder settings in: %s", conf_path)
+    except OSError as e:
+        log.warning("Could not tune Vosk model.conf: %s", e)
+
+_vosk = None
+_vosk_lock = threading.Lock()
+
+def _get_vosk():
+    """Load the Vosk model and recognizers on first use -> (model, recognizer, command recognizer)"""
+    with _vosk_lock:
+        return _load_vosk()
+
+def _load_vosk():
+    global _vosk
+    if _vosk is not None:
+        return _vosk
     
-    print(f"[INFO] TTS engine initialized successfully")
+    try:
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+    except ImportError as e:
+        log.error("Offline recognition unavailable, vosk is not installed: %s", e)
+        _vosk = (None, None, None)
+        return _vosk
+    SetLogLevel(-1)
     
-except Exception as e:
-    print(f"[WARN] TTS setup issue: {e}")
-    engine.setProperty('rate', 175)
-    engine.setProperty('volume', 1.0)
+    # Load Vosk model with check
+    if os.path.exists(VOSK_MODEL_PATH) and os.path.isdir(VOSK_MODEL_PATH):
+        tune_vosk_model_conf(VOSK_MODEL_PATH)
+        log.debug("Loading Vosk model from: %s", VOSK_MODEL_PATH)
+        vosk_model = Model(VOSK_MODEL_PATH)
+        # One recognizer reused across utterances (Reset() between them) - creating it is the costly part
+        rec = KaldiRecognizer(vosk_model, 16000)
+        # Command phase only needs our small vocabulary - a grammar shrinks the search graph drastically
+        cmd_rec = KaldiRecognizer(vosk_model, 16000, GRAMMAR)
+        _vosk = (vosk_model, rec, cmd_rec)
+    else:
+        log.error("Vosk model not found at: %s", VOSK_MODEL_PATH)
+        _vosk = (None, None, None)
+    return _vosk
 
-SetLogLevel(-1)
+def vosk_available():
+    """Whether offline recognition can work (vosk installed, model on disk), without loading it"""
+    return importlib.util.find_spec("vosk") is not None and os.path.isdir(VOSK_MODEL_PATH)
 
-# Load Vosk model with check
-if os.path.exists(VOSK_MODEL_PATH) and os.path.isdir(VOSK_MODEL_PATH):
-    print(f"[DEBUG] Loading Vosk model from: {VOSK_MODEL_PATH}")
-    vosk_model = Model(VOSK_MODEL_PATH)
-else:
-    print(f"[ERROR] Vosk model not found at: {VOSK_MODEL_PATH}")
-    vosk_model = None
+def new_vosk_recognizer():
+    """A fresh 16kHz recognizer on the shared model for an independent audio stream, or None"""
+    vosk_model = _get_vosk()[0]
+    if vosk_model is None:
+        return None
+    from vosk import KaldiRecognizer
+    return KaldiRecognizer(vosk_model, 16000)
 
 recognizer = sr.Recognizer()
 # Improved settings to avoid false triggers
@@ -126,93 +271,201 @@ recognizer.pause_threshold = 1.0   # Longer pause before considering speech ende
 recognizer.phrase_threshold = 0.3   # Minimum audio length to consider as speech
 recognizer.non_speaking_duration = 0.8  # Time of non-speaking before stopping
 
-try:
-    # Find the correct microphone (avoid speakers)
+# Load the Vosk model in the background while the microphone is enumerated and calibrated;
+# _get_vosk() waits for it (via _vosk_lock) if it's needed before loading finishes.
+# The "speech" test never recognizes anything, so it skips loading Kaldi and the model.
+_vosk_loader = None
+if not (__name__ == "__main__" and sys.argv[1:2] == ["speech"]):
+    _vosk_loader = threading.Thread(target=_get_vosk, daemon=True)
+    _vosk_loader.start()
+
+def _load_cached_mic_index():
+    """Device index chosen on a previous run, if any"""
+    try:
+        with open(MIC_CACHE_PATH) as f:
+            return json.load(f).get("device_index")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _save_mic_index(index):
+    try:
+        os.makedirs(os.path.dirname(MIC_CACHE_PATH), exist_ok=True)
+        with open(MIC_CACHE_PATH, "w") as f:
+            json.dump({"device_index": index}, f)
+    except OSError as e:
+        log.warning("Could not cache microphone choice: %s", e)
+
+def _find_microphone():
+    """Find the correct microphone (avoid speakers)"""
     available_mics = sr.Microphone.list_microphone_names()
-    print(f"[INFO] Available microphones: {len(available_mics)}")
+    log.info("Available microphones: %s", len(available_mics))
     
     mic_index = None
     for i, mic_name in enumerate(available_mics):
-        print(f"  {i}: {mic_name}")
+        log.info("  %s: %s", i, mic_name)
         # Select first device that's clearly a microphone
         if mic_index is None and ("microphone" in mic_name.lower() or "mic" in mic_name.lower()):
             mic_index = i
-            print(f"[INFO] Selected microphone: {mic_name}")
-    
-    # Use the found microphone or default
-    if mic_index is not None:
-        mic = sr.Microphone(device_index=mic_index, sample_rate=16000, chunk_size=1024)
-    else:
-        mic = sr.Microphone(sample_rate=16000, chunk_size=1024)
-    
-    # Test microphone
+            log.info("Selected microphone: %s", mic_name)
+    return mic_index
+
+def _calibrate_microphone(index):
+    """Open the microphone (or the default one if index is None) and calibrate the recognizer"""
+    mic = sr.Microphone(device_index=index, sample_rate=16000, chunk_size=1024)
     with mic as source:
-        print("[INFO] Adjusting for ambient noise...")
+        log.info("Adjusting for ambient noise...")
         recognizer.adjust_for_ambient_noise(source, duration=2)
-        print(f"[INFO] Energy threshold set to: {recognizer.energy_threshold}")
-        
-except OSError as e:
-    print(f"[ERROR] Microphone setup failed: {e}")
-    print("[WARN] Using system default microphone")
-    mic = sr.Microphone(sample_rate=16000, chunk_size=1024)
+        log.info("Energy threshold set to: %s", recognizer.energy_threshold)
+    return mic
+
+# Reuse the device picked on a previous run so we can skip enumerating every device
+mic = None
+mic_index = _load_cached_mic_index()
+if mic_index is not None:
+    try:
+        mic = _calibrate_microphone(mic_index)
+        log.info("Using cached microphone: %s", mic_index)
+    except (OSError, AssertionError) as e:
+        log.warning("Cached microphone %s unavailable (%s), searching again", mic_index, e)
+        mic_index = None
+
+if mic is None:
+    try:
+        mic_index = _find_microphone()
+        mic = _calibrate_microphone(mic_index)
+        if mic_index is not None:
+            _save_mic_index(mic_index)
+    except OSError as e:
+        log.error("Microphone setup failed: %s", e)
+        log.warning("Using system default microphone")
+        mic_index = None
+        mic = sr.Microphone(sample_rate=16000, chunk_size=1024)
+
+# Set while TTS is pending/playing so the capture thread doesn't record Siri's own voice
+speaking_event = threading.Event()
+# TTS runs on a single worker so the main loop can go back to listening right away
+_tts_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+_tts_lock = threading.Lock()
+_tts_pending = 0
 
 def speak(text):
+    """Queue text for speech without blocking the caller"""
+    global _tts_pending
     print(f"Siri: {text}")
+    with _tts_lock:
+        _tts_pending += 1
+        speaking_event.set()
+    _tts_executor.submit(_do_speak, text)
+
+def _do_speak(text):
+    global _tts_pending
     try:
+        engine = _get_engine()
         engine.say(text)
         engine.runAndWait()
     except Exception as e:
-        print(f"[ERROR] Speech failed: {e}")
+        log.error("Speech failed: %s", e)
         # Fallback - just print if speech fails
-        print(f"[FALLBACK] Siri would say: {text}")
+        log.warning("Siri would say: %s", text)
+    finally:
+        with _tts_lock:
+            _tts_pending -= 1
+            if not _tts_pending:
+                speaking_event.clear()
+
+def _edit_budget(key):
+    """Misheard letters tolerated for a key - short names are too easy to hit by accident"""
+    return 1 if len(key) <= 5 else 2
 
 def fuzzy_match(query, choices):
     if not query.strip():
         return None
-    match, score = process.extractOne(query, choices)
-    print(f"[DEBUG] Fuzzy match: '{query}' -> '{match}' (score: {score})")
-    return match if score >= 60 else None  # Lowered threshold
+    choices = tuple(choices)
+    # Match on the spoken target ("siri open chrome" -> "chrome"), not the whole utterance
+    target = _WS_RE.sub(" ", _STRIP_RE.sub(" ", query)).strip()
+    # Exact hits need no scoring at all
+    if target in choices:
+        return target
+    return _fuzzy_match_cached(query, target, choices)
+
+@functools.lru_cache(maxsize=512)
+def _fuzzy_match_cached(query, target, choices):
+    """Fuzzy match against a fixed set of choices; results are memoized per (query, choices)"""
+    from rapidfuzz import process, fuzz
+    from rapidfuzz.distance import Levenshtein
+    
+    # Single-word targets: allow a misheard letter or two (bounded edit distance)
+    if target and " " not in target:
+        best = None
+        for key in choices:
+            budget = _edit_budget(key)
+            edits = Levenshtein.distance(target, key, score_cutoff=budget)
+            if edits <= budget and (best is None or edits < best[1]):
+                best = (key, edits)
+        if best is not None:
+            log.debug("Fuzzy match: '%s' -> '%s' (edits: %s)", query, best[0], best[1])
+            return best[0]
+    
+    # Multi-word or noisier queries fall back to weighted ratio scoring
+    result = process.extractOne(query, choices, scorer=fuzz.WRatio, score_cutoff=60)  # Lowered threshold
+    if result is None:
+        log.debug("Fuzzy match: '%s' -> no match", query)
+        return None
+    match, score = result[0], result[1]
+    log.debug("Fuzzy match: '%s' -> '%s' (score: %s)", query, match, score)
+    return match
 
 def open_app(app_name):
-    """Open application based on platform"""
-    system = platform.system()
+    """Open application based on platform (returns as soon as it's launched)"""
+    if _SYSTEM == "Darwin":  # macOS
+        args = ["open", "-a", app_name]
+    elif _SYSTEM == "Windows":
+        args = ["start", "", app_name]
+    else:  # Linux
+        args = [app_name]
+    
     try:
-        if system == "Darwin":  # macOS
-            subprocess.run(["open", "-a", app_name], check=True)
-        elif system == "Windows":
-            subprocess.run(["start", "", app_name], shell=True, check=True)
-        else:  # Linux
-            subprocess.run([app_name], check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Failed to open app {app_name}: {e}")
-        return False
+        # Don't wait for the app to exit - CLI tools like terminals/editors would block the main loop
+        p = subprocess.Popen(args, shell=(_SYSTEM == "Windows"), start_new_session=True,
+                             stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return p.pid is not None
     except FileNotFoundError:
-        print(f"[ERROR] App {app_name} not found")
+        log.error("App %s not found", app_name)
+        return False
+    except OSError as e:
+        log.error("Failed to open app %s: %s", app_name, e)
         return False
 
+_browser = None
+
+def _get_browser():
+    """Resolve the default browser controller once instead of on every open"""
+    global _browser
+    if _browser is None:
+        try:
+            _browser = webbrowser.get()
+        except webbrowser.Error:
+            _browser = webbrowser
+    return _browser
+
 def open_website(url):
     """Open website in default browser"""
     try:
-        webbrowser.open(url)
+        _get_browser().open_new_tab(url)
         return True
     except Exception as e:
-        print(f"[ERROR] Failed to open website {url}: {e}")
+        log.error("Failed to open website %s: %s", url, e)
         return False
 
 def parse_search_command(cmd):
     """Parse command to extract platform and search query"""
     cmd = cmd.lower().strip()
-    print(f"[DEBUG] Parsing search command: '{cmd}'")
-    
-    # Remove common words but keep original for reference
-    clean_cmd = cmd.replace("open", "").replace("launch", "").replace("start", "").replace(WAKE_WORD, "").replace("please", "").strip()
+    log.debug("Parsing search command: '%s'", cmd)
     
     # Check if it's a search command (contains "play", "search", "find", etc.)
-    search_keywords = ["play", "search", "find", "look for", "show me", "watch", "listen to", "listen", "watch"]
-    has_search = any(keyword in cmd for keyword in search_keywords)
+    has_search = bool(_SEARCH_RE.search(cmd))
     
-    print(f"[DEBUG] Has search keywords: {has_search}")
+    log.debug("Has search keywords: %s", has_search)
     
     if not has_search:
         return None, None, cmd  # No search, just regular open command
@@ -224,7 +477,7 @@ def parse_search_command(cmd):
             platform = platform_name
             break
     
-    print(f"[DEBUG] Detected platform: {platform}")
+    log.debug("Detected platform: %s", platform)
     
     if not platform:
         # Default to YouTube for video searches, Google for everything else
@@ -232,49 +485,52 @@ def parse_search_command(cmd):
             platform = "youtube"
         else:
             platform = "google"
-        print(f"[DEBUG] Defaulting to platform: {platform}")
+        log.debug("Defaulting to platform: %s", platform)
     
-    # Extract search query - be more intelligent about this
-    query = cmd
+    # Extract search query: drop the platform name, search keywords and filler words
+    query = re.sub(rf'\b{platform}\b', '', cmd)
+    query = _WS_RE.sub(' ', _STRIP_RE.sub('', query)).strip()
     
-    # Remove platform name and search keywords
-    for keyword in search_keywords + [platform]:
-        query = query.replace(keyword, "")
-    
-    # Remove other common words
-    query = query.replace("and", "").replace("for", "").replace("some", "").replace("a", "").replace("the", "").strip()
-    
-    print(f"[DEBUG] Extracted search query: '{query}'")
+    log.debug("Extracted search query: '%s'", query)
     
     if not query:
         return platform, None, None
     
     return platform, query, None
 
+# Characters quote_plus leaves untouched (plus space, which becomes "+")
+_URL_SAFE_RE = re.compile(r'[A-Za-z0-9_.~ -]*')
+
+def _fast_encode(query):
+    """quote_plus, with a fast path for the plain lowercase words ASR returns"""
+    if _URL_SAFE_RE.fullmatch(query):
+        return query.replace(" ", "+")
+    return urllib.parse.quote_plus(query)
+
 def open_with_search(platform, query):
     """Open platform with search query"""
-    if platform not in SEARCH_PATTERNS:
-        print(f"[ERROR] Platform {platform} not supported for search")
+    search_prefix = SEARCH_PATTERNS.get(platform)
+    if search_prefix is None:
+        log.error("Platform %s not supported for search", platform)
         return False
     
     # URL encode the search query
-    encoded_query = urllib.parse.quote_plus(query)
-    search_url = SEARCH_PATTERNS[platform] + encoded_query
+    search_url = search_prefix + _fast_encode(query)
     
-    print(f"[DEBUG] Opening {platform} with search: {query}")
-    print(f"[DEBUG] URL: {search_url}")
+    log.debug("Opening %s with search: %s", platform, query)
+    log.debug("URL: %s", search_url)
     
     try:
-        webbrowser.open(search_url)
+        _get_browser().open_new_tab(search_url)
         return True
     except Exception as e:
-        print(f"[ERROR] Failed to open search URL: {e}")
+        log.error("Failed to open search URL: %s", e)
         return False
 
 def open_command(target):
     """Main function to handle open commands - now with search support"""
     target = target.lower().strip()
-    print(f"[DEBUG] Processing open command for: '{target}'")
+    log.debug("Processing open command for: '%s'", target)
     
     if not target:
         speak("I didn't catch what you want me to open. Please try again.")
@@ -302,10 +558,10 @@ def open_command(target):
         target = remaining_cmd
     
     # Try to match with apps first
-    app_match = fuzzy_match(target, APP_MAP.keys())
+    app_match = fuzzy_match(target, _APP_KEYS)
     if app_match:
         app_name = APP_MAP[app_match]
-        print(f"[DEBUG] Attempting to open app: {app_name}")
+        log.debug("Attempting to open app: %s", app_name)
         speak(f"Opening {app_match}")
         if open_app(app_name):
             speak(f"{app_match} is now open")
@@ -315,10 +571,10 @@ def open_command(target):
             return
     
     # Try to match with websites
-    web_match = fuzzy_match(target, WEB_DEFAULTS.keys())
+    web_match = fuzzy_match(target, _WEB_KEYS)
     if web_match:
         url = WEB_DEFAULTS[web_match]
-        print(f"[DEBUG] Attempting to open website: {url}")
+        log.debug("Attempting to open website: %s", url)
         speak(f"Opening {web_match}")
         if open_website(url):
             speak(f"{web_match} is now open in your browser")
@@ -331,7 +587,7 @@ def open_command(target):
     if target.startswith("http") or "." in target:
         if not target.startswith("http"):
             target = f"https://{target}"
-        print(f"[DEBUG] Attempting to open URL: {target}")
+        log.debug("Attempting to open URL: %s", target)
         speak(f"Opening {target}")
         if open_website(target):
             speak("Website is now open in your browser")
@@ -339,24 +595,131 @@ def open_command(target):
     
     speak(f"Sorry, I don't know how to open {target}. Try saying the name more clearly.")
 
+# Background capture: the mic keeps recording into audio_q while we recognize/speak
+audio_q = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+_capture_thread = None
+_capture_error = None
+
+class AudioCaptureError(RuntimeError):
+    """The background capture thread died, so no more audio will arrive"""
+
+def _read_blocks():
+    """Yield 200 ms blocks of 16kHz 16-bit mono audio - sounddevice if installed, else PyAudio"""
+    try:
+        import sounddevice as sd
+    except ImportError:
+        sd = None
+    
+    if sd is not None:
+        with sd.RawInputStream(samplerate=16000, blocksize=VOSK_BLOCK_SIZE, dtype='int16',
+                               channels=1, device=mic_index) as stream:
+            while True:
+                data, _ = stream.read(VOSK_BLOCK_SIZE)
+                yield bytes(data)
+    else:
+        log.info("sounddevice not installed - capturing through PyAudio")
+        with sr.Microphone(device_index=mic_index, sample_rate=16000,
+                           chunk_size=VOSK_BLOCK_SIZE) as source:
+            while True:
+                yield source.stream.read(VOSK_BLOCK_SIZE)
+
+def _capture_loop():
+    """Continuously capture audio blocks into audio_q"""
+    global _capture_error
+    try:
+        for frame in _read_blocks():
+            if speaking_event.is_set():
+                # Drop TTS echo instead of pausing between commands
+                continue
+            try:
+                audio_q.put_nowait(frame)
+            except queue.Full:
+                # Nobody is consuming - drop the oldest block rather than stall capture
+                try:
+                    audio_q.get_nowait()
+                except queue.Empty:
+                    pass
+                audio_q.put_nowait(frame)
+    except Exception as e:
+        _capture_error = e
+        log.error("Audio capture stopped: %s", e)
+
+def start_capture():
+    """Start the background capture thread, or restart it if it has died"""
+    global _capture_thread, _capture_error
+    if _capture_thread is None or not _capture_thread.is_alive():
+        _capture_error = None
+        _capture_thread = threading.Thread(target=_capture_loop, daemon=True)
+        _capture_thread.start()
+
+def _check_capture():
+    """Raise AudioCaptureError if the capture thread has stopped"""
+    if not _capture_thread.is_alive():
+        raise AudioCaptureError(f"Audio capture failed: {_capture_error}")
+
+def _rms(frame):
+    """Root-mean-square energy of a 16-bit audio block"""
+    if audioop is not None:
+        return audioop.rms(frame, 2)
+    samples = array.array('h', frame)
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(x * x for x in samples) / len(samples)))
+
 def wait_for_speech():
     """Wait for actual speech, not just background noise"""
-    print("[INFO] Waiting for speech...")
-    try:
-        with mic as source:
-            # Listen with longer timeout to avoid false triggers
-            audio = recognizer.listen(
-                source, 
-                timeout=10,      # Wait up to 10 seconds for speech
-                phrase_time_limit=5  # Max 5 seconds of speech
-            )
-        return audio
-    except sr.WaitTimeoutError:
-        print("[DEBUG] No speech detected in timeout period")
-        return None
+    log.info("Waiting for speech...")
+    start_capture()
+    
+    block_seconds = VOSK_BLOCK_SIZE / 16000
+    frames = []
+    preroll = None
+    silence = 0.0
+    start = time.monotonic()
+    speech_start = None
+    while True:
+        try:
+            frame = audio_q.get(timeout=block_seconds * 2)
+        except queue.Empty:
+            frame = None
+            _check_capture()
+        
+        if not frames:
+            # Wait up to 10 seconds for speech
+            if time.monotonic() - start > 10:
+                log.debug("No speech detected in timeout period")
+                return None
+            if frame is None:
+                continue
+            if _rms(frame) > recognizer.energy_threshold:
+                # Keep one block before the onset so the first syllable isn't clipped
+                frames = [preroll, frame] if preroll else [frame]
+                speech_start = time.monotonic()
+            else:
+                preroll = frame
+            continue
+        
+        if frame is not None:
+            frames.append(frame)
+            if _rms(frame) > recognizer.energy_threshold:
+                silence = 0.0
+            else:
+                silence += block_seconds
+        
+        # Stop after a pause, or at max 5 seconds of speech (by wall clock too, in case
+        # blocks stop arriving mid-utterance)
+        if (silence >= recognizer.pause_threshold or len(frames) * block_seconds >= 5
+                or time.monotonic() - speech_start >= 5):
+            return sr.AudioData(b"".join(frames), 16000, 2)
+
+def _raw_16k(audio):
+    """Raw 16kHz 16-bit audio bytes, only resampling when the capture format differs"""
+    if audio.sample_rate == 16000 and audio.sample_width == 2:
+        return audio.frame_data
+    return audio.get_raw_data(convert_rate=16000, convert_width=2)
 
 def listen_google():
-    print("[DEBUG] Listening with Google Speech API...")
+    log.debug("Listening with Google Speech API...")
     
     if not CONTINUOUS_MODE:
         print("Press ENTER and then speak, or just start speaking...")
@@ -366,7 +729,7 @@ def listen_google():
         return ""
         
     try:
-        print("[DEBUG] Processing audio...")
+        log.debug("Processing audio...")
         # Convert audio to proper format for Google API
         try:
             text = recognizer.recognize_google(
@@ -374,69 +737,116 @@ def listen_google():
                 language='en-US',
                 show_all=False
             ).lower()
-            print(f"[DEBUG] Google heard: '{text}'")
+            log.debug("Google heard: '%s'", text)
             return text
         except sr.RequestError as e:
-            print("[DEBUG] Trying alternative audio format...")
-            raw_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
+            log.debug("Trying alternative audio format...")
+            raw_data = _raw_16k(audio)
             audio_16k = sr.AudioData(raw_data, 16000, 2)
             text = recognizer.recognize_google(audio_16k, language='en-US').lower()
-            print(f"[DEBUG] Google heard (16kHz): '{text}'")
+            log.debug("Google heard (16kHz): '%s'", text)
             return text
         
     except sr.UnknownValueError:
-        print("[WARN] Google could not understand audio.")
+        log.warning("Google could not understand audio.")
         return ""
     except sr.RequestError as e:
         error_msg = str(e).lower()
-        print(f"[ERROR] Google Speech API: {e}")
-        print("[INFO] Falling back to offline mode...")
+        log.error("Google Speech API: %s", e)
+        log.info("Falling back to offline mode...")
         return None
     except Exception as e:
-        print(f"[ERROR] Unexpected error in Google recognition: {e}")
+        log.error("Unexpected error in Google recognition: %s", e)
         return None
 
-def listen_vosk():
-    if not vosk_model:
-        print("[ERROR] Offline mode unavailable. No Vosk model found.")
-        return ""
-    print("[DEBUG] Listening with Vosk offline mode...")
+def listen_vosk_wake():
+    """Listen offline with the full-vocabulary recognizer (wake word phase)"""
+    return listen_vosk(_get_vosk()[1])
+
+def listen_vosk_cmd():
+    """Listen offline with the grammar-restricted recognizer (command phase), re-decoding
+    free-text searches with the full-vocabulary one"""
+    _, rec, cmd_rec = _get_vosk()
+    return listen_vosk(cmd_rec, full_rec=rec)
+
+def _vosk_text(result, key="text"):
+    """Recognized text from a Vosk JSON result (may contain [unk] placeholders)"""
+    return json.loads(result).get(key, "").lower().strip()
+
+def listen_vosk(rec, full_rec=None):
+    """Stream microphone audio straight into Vosk so decoding overlaps capture
     
-    audio = wait_for_speech()
-    if not audio:
+    With full_rec, an utterance the grammar couldn't cover - [unk] words, or a search verb
+    followed by a free-text query - is decoded again from the buffered audio with full_rec.
+    """
+    if rec is None:
+        log.error("Offline mode unavailable. No Vosk model found.")
         return ""
-        
+    log.debug("Listening with Vosk offline mode...")
+    
     try:
-        print("[DEBUG] Converting audio for Vosk...")
-        rec = KaldiRecognizer(vosk_model, 16000)
+        rec.Reset()
+        text = ""
+        partial = ""
+        start = time.monotonic()
+        speech_start = None
+        utterance = []
         
-        # Convert audio to 16kHz, 16-bit mono (Vosk requirement)
-        audio_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
-        print(f"[DEBUG] Audio data length: {len(audio_data)} bytes")
+        start_capture()
+        # Captured blocks are already 16kHz, 16-bit mono (Vosk requirement) - no resampling needed
+        while True:
+            try:
+                frame = audio_q.get(timeout=1)
+            except queue.Empty:
+                frame = None
+                _check_capture()
+            
+            if frame is not None:
+                utterance.append(frame)
+                if rec.AcceptWaveform(frame):
+                    # Vosk detected the end of the utterance
+                    text = _vosk_text(rec.Result())
+                    if text:
+                        break
+                    utterance = []
+                    continue
+                partial = _vosk_text(rec.PartialResult(), "partial")
+            
+            now = time.monotonic()
+            if partial and speech_start is None:
+                speech_start = now
+            if speech_start is None:
+                # Before speech only a short preroll is worth keeping for a re-decode
+                del utterance[:-2]
+            
+            if speech_start is None and now - start > 10:  # Wait up to 10 seconds for speech
+                log.debug("No speech detected in timeout period")
+                return ""
+            if speech_start is not None and now - speech_start > 5:  # Max 5 seconds of speech
+                text = _vosk_text(rec.FinalResult())
+                break
         
-        # Process audio in chunks (Vosk works better this way)
-        chunk_size = 4000  # Process in smaller chunks
-        for i in range(0, len(audio_data), chunk_size):
-            chunk = audio_data[i:i+chunk_size]
-            rec.AcceptWaveform(chunk)
+        log.debug("Vosk heard: '%s'", text)
         
-        # Get final result
-        final_result = rec.FinalResult()
-        result = json.loads(final_result)
+        # If no result, fall back to the last partial result
+        if not text:
+            text = partial
+            log.debug("Vosk partial: '%s'", text)
         
-        text = result.get("text", "").lower().strip()
-        print(f"[DEBUG] Vosk heard: '{text}'")
+        if full_rec is not None and utterance and (_UNK_RE.search(text) or _SEARCH_RE.search(text)):
+            full_rec.Reset()
+            full_rec.AcceptWaveform(b"".join(utterance))
+            full_text = _vosk_text(full_rec.FinalResult())
+            log.debug("Vosk full vocabulary heard: '%s'", full_text)
+            if full_text:
+                text = full_text
         
-        # If no result, try partial result
-        if not text:
-            partial_result = rec.PartialResult()
-            partial = json.loads(partial_result)
-            text = partial.get("partial", "").lower().strip()
-            print(f"[DEBUG] Vosk partial: '{text}'")
-            
-        return text
+        # Whatever the grammar couldn't place comes back as literal "[unk]" tokens
+        return _UNK_RE.sub(" ", text).strip()
+    except AudioCaptureError:
+        raise
     except Exception as e:
-        print(f"[ERROR] Vosk listening failed: {e}")
+        log.error("Vosk listening failed: %s", e)
         return ""
 
 def handle_system_commands(cmd):
@@ -444,8 +854,7 @@ def handle_system_commands(cmd):
     cmd = cmd.lower().strip()
     
     # Shutdown commands
-    shutdown_keywords = ["shutdown", "stop", "quit", "exit", "bye", "goodbye", "sleep"]
-    if any(keyword in cmd for keyword in shutdown_keywords):
+    if _SHUTDOWN_RE.search(cmd):
         speak("Goodbye! Siri is shutting down now.")
         return True  # Signal to shut down
     
@@ -464,8 +873,8 @@ def main():
     speak(f"Running in {mode_text}")
     
     # Test microphone first
-    print(f"\n[INFO] Mode: {'Continuous' if CONTINUOUS_MODE else 'Smart Detection'}")
-    print("[INFO] Testing microphone...")
+    log.info("Mode: %s", 'Continuous' if CONTINUOUS_MODE else 'Smart Detection')
+    log.info("Testing microphone...")
     speak("Testing microphone and speech systems.")
     
     while True:
@@ -475,62 +884,69 @@ def main():
             
         text = listen_google()
         if text is None:  # Google failed → try offline
-            text = listen_vosk()
+            text = listen_vosk_wake()
         
         # Skip empty results or background noise
         if not text or len(text.strip()) < 2:
             continue
             
         if WAKE_WORD not in text:
-            print(f"[DEBUG] No wake word in: '{text}' - continuing to listen...")
+            log.debug("No wake word in: '%s' - continuing to listen...", text)
             continue
             
-        print(f"[DEBUG] Wake word detected in: '{text}'")
+        log.debug("Wake word detected in: '%s'", text)
         speak("Yes, what would you like me to do?")
         
         # Listen for command with a timeout
         print("🎤 Listening for your command...")
         cmd = listen_google()
         if cmd is None:
-            cmd = listen_vosk()
+            cmd = listen_vosk_cmd()
         
         if not cmd or len(cmd.strip()) < 2:
             speak("I didn't hear a clear command. Please try again.")
             continue
             
-        print(f"[DEBUG] Command received: '{cmd}'")
+        log.debug("Command received: '%s'", cmd)
         
         # Check for system commands first
         if handle_system_commands(cmd):
             break  # Exit the main loop
         
         # Check if it's an open/search command
-        if any(keyword in cmd for keyword in ["open", "play", "search", "find", "watch", "listen", "launch", "start"]) or any(app in cmd for app in APP_MAP.keys()) or any(site in cmd for site in WEB_DEFAULTS.keys()):
+        tokens = set(cmd.split())
+        if tokens & _OPEN_VERBS or _OPEN_TARGETS_RE.search(cmd):
             # Pass the full command to open_command for processing
             open_command(cmd)
         else:
             speak("Please tell me what to open, or say help for assistance.")
-        
-        # Small pause before listening again
-        time.sleep(1)
+
+def _run_speech_test():
+    engine = _get_engine()
+    voices = engine.getProperty('voices')
+    if voices:
+        current_voice = engine.getProperty('voice')
+        print("Available voices:")
+        for i, voice in enumerate(voices):
+            marker = "* " if voice.id == current_voice else "  "
+            print(f"{marker}{i}: {voice.name} ({voice.id})")
+    
+    print(f"Rate: {engine.getProperty('rate')}")
+    print(f"Volume: {engine.getProperty('volume')}")
+    
+    print("Testing speech...")
+    text = "Hello, this is Siri speaking. Can you hear me clearly?"
+    print(f"Siri: {text}")
+    engine.say(text)
+    engine.runAndWait()
 
 def test_speech():
     """Test text-to-speech"""
     print("\n=== SPEECH TEST ===")
     try:
-        voices = engine.getProperty('voices')
-        if voices:
-            current_voice = engine.getProperty('voice')
-            print("Available voices:")
-            for i, voice in enumerate(voices):
-                marker = "* " if voice.id == current_voice else "  "
-                print(f"{marker}{i}: {voice.name} ({voice.id})")
-        
-        print(f"Rate: {engine.getProperty('rate')}")
-        print(f"Volume: {engine.getProperty('volume')}")
-        
-        print("Testing speech...")
-        speak("Hello, this is Siri speaking. Can you hear me clearly?")
+        # pyttsx3 engines belong to the thread that created them - test on the TTS worker,
+        # the same thread speak() uses, and wait so failures are reported here
+        _tts_executor.submit(_run_speech_test).result()
         return True
     except Exception as e:
         print(f"Speech test failed: {e}")
@@ -565,7 +981,7 @@ def test_microphone():
         print("Testing Google Speech API...")
         try:
             # Try with 16kHz conversion
-            raw_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
+            raw_data = _raw_16k(audio)
             audio_16k = sr.AudioData(raw_data, 16000, 2)
             result = test_recognizer.recognize_google(audio_16k)
             print(f"✅ Google Speech API working: '{result}'")
@@ -574,17 +990,13 @@ def test_microphone():
             print(f"❌ Google Speech API failed: {e}")
     
         # Test Vosk if Google fails
+        vosk_model, rec, _ = _get_vosk()
         if vosk_model:
             print("Testing Vosk offline recognition...")
             try:
-                rec = KaldiRecognizer(vosk_model, 16000)
-                audio_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
-                
-                # Process in chunks
-                chunk_size = 4000
-                for i in range(0, len(audio_data), chunk_size):
-                    chunk = audio_data[i:i+chunk_size]
-                    rec.AcceptWaveform(chunk)
+                rec.Reset()
+                # Feed the whole recording at once - Vosk buffers to its own frame size
+                rec.AcceptWaveform(_raw_16k(audio))
                 
                 final_result = rec.FinalResult()
                 result_dict = json.loads(final_result)
@@ -612,8 +1024,6 @@ def test_microphone():
     return False
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == "test":
         test_microphone()
         sys.exit()
@@ -624,8 +1034,8 @@ if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print("\n[INFO] Shutting down...")
+        log.info("Shutting down...")
         speak("Goodbye!")
     except Exception as e:
-        print(f"[ERROR] Unexpected error: {e}")
+        log.error("Unexpected error: %s", e)
         speak("Sorry, something went wrong.")
\ No newline at end of file
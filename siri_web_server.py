@@ -6,15 +6,147 @@ A Flask-based web interface for voice commands
 
 import os
 import sys
-from flask import Flask, request, jsonify, render_template_string
+import importlib.util
+import gzip
+import hashlib
+import re
+import functools
+import concurrent.futures
+import atexit
+import queue
+import logging
+import logging.handlers
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
+
+# Optional: brotli-compressed home page for browsers that accept it (pip install brotli)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional: persistent WebSocket channel for commands (pip install flask-sock)
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+HOST = '127.0.0.1'
+PORT = 8080
+
+def dev_mode_requested():
+    """True when --dev or SIRI_DEV asks for Werkzeug's debug server"""
+    return "--dev" in sys.argv[1:] or os.getenv('SIRI_DEV', '').strip().lower() in ('1', 'true', 'yes')
+
+def pick_server(allow_gunicorn=True):
+    """Server main() will run the app under: 'dev', 'gunicorn', 'waitress' or 'flask'"""
+    if dev_mode_requested():
+        return 'dev'
+    # Check against this interpreter - a gunicorn script earlier on PATH may belong
+    # to another Python that can't import Flask, and its worker would just die
+    if allow_gunicorn and sys.platform != "win32" and importlib.util.find_spec('gunicorn') is not None:
+        return 'gunicorn'
+    if importlib.util.find_spec('waitress') is not None:
+        return 'waitress'
+    return 'flask'
+
+def exec_gunicorn():
+    """Replace this process with gunicorn serving wsgi:app; only returns if that fails"""
+    # One worker process: each worker imports siri.py with its own mic/TTS engine,
+    # so concurrency comes from gthread threads instead of extra processes. Every open
+    # page holds a thread on /ws (and another on /asr while server recognition runs),
+    # so there are plenty of them.
+    gunicorn_args = [sys.executable, '-m', 'gunicorn', '-w', '1', '-k', 'gthread', '--threads', '64',
+                     '--keep-alive', '75', '-b', f'{HOST}:{PORT}',
+                     '--chdir', os.path.dirname(os.path.abspath(__file__)), 'wsgi:app']
+    try:
+        os.execv(sys.executable, gunicorn_args)
+    except OSError as e:
+        print(f"⚠️  Could not start gunicorn ({e})")
+
+# Run as a script, hand over to gunicorn before the siri import below: that import calibrates
+# the microphone and loads Vosk, and the gunicorn worker would only do it all again
+if __name__ == "__main__":
+    SERVER = pick_server()
+    if SERVER == 'gunicorn':
+        exec_gunicorn()
+        SERVER = pick_server(allow_gunicorn=False)
+else:
+    # Imported through wsgi.py by a WSGI server (gunicorn - see wsgi.py)
+    SERVER = 'gunicorn'
+
+# waitress can't hand the raw socket to flask-sock, so WebSocket routes only exist elsewhere
+WEBSOCKETS_ENABLED = Sock is not None and SERVER != 'waitress'
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# Use orjson for request parsing and jsonify when it's installed (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    class OrjsonProvider(JSONProvider):
+        """Flask JSON provider backed by orjson"""
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = OrjsonProvider(app)
+
+# All command keywords in one compiled pattern: a single scan of the command tells us
+# which keyword groups it mentions (substring matches, like the voice transcripts need)
+_CMD_KEYWORDS = {
+    'search': ('find', 'search', 'watch'),
+    'play': ('play',),
+    'open': ('open', 'listen', 'launch', 'start'),
+    'youtube': ('youtube',),
+    'spotify': ('spotify',),
+    'chrome': ('chrome',),
+    'safari_firefox': ('safari', 'firefox'),
+    'browser_word': ('browser',),
+    'demo_search': ('cooking', 'video'),
+    'help': ('help',),
+}
+_CMD_RE = re.compile('|'.join(f"(?P<{group}>{'|'.join(words)})" for group, words in _CMD_KEYWORDS.items()))
+_OPEN_GROUPS = frozenset(('search', 'play', 'open'))
+_YT_SEARCH_GROUPS = frozenset(('search', 'play'))
+_BROWSER_GROUPS = frozenset(('chrome', 'safari_firefox'))
+_DEMO_YT_SEARCH_GROUPS = frozenset(('search', 'demo_search'))
+_DEMO_BROWSER_GROUPS = frozenset(('chrome', 'browser_word'))
+_SHUTDOWN_WORDS = frozenset(('shutdown', 'quit', 'exit', 'stop'))
+
+def keyword_pattern(groups):
+    """Regex source matching any keyword of the given groups (shared with the page's JS)"""
+    return '|'.join(word for group in sorted(groups) for word in _CMD_KEYWORDS[group])
+
+def command_groups(command):
+    """Set of keyword groups (see _CMD_RE) mentioned in an already-lowercased command"""
+    return {m.lastgroup for m in _CMD_RE.finditer(command)}
+
+# Log through a queue so request threads never block on stdout; the listener thread
+# does the actual writes. Configured before importing siri so its basicConfig is a no-op.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+# The queue side passes the bare message through; only the listener's handler adds the prefix
+logging.basicConfig(level=logging.INFO, format="%(message)s",
+                    handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
+log = logging.getLogger("siri.web")
+
 # Check if siri.py backend is available
 try:
     # Try to import the siri backend functions
-    from siri import open_command, handle_system_commands
+    from siri import (open_command, handle_system_commands, new_vosk_recognizer, vosk_available,
+                      SHUTDOWN_KEYWORDS)
     BACKEND_AVAILABLE = True
     print("✅ Siri backend (siri.py) loaded successfully!")
 except ImportError:
@@ -23,545 +155,308 @@ except ImportError:
     
     # Define dummy functions for demo mode
     def open_command(command):
-        print(f"Demo: Would execute open_command('{command}')")
+        log.info("Demo: Would execute open_command('%s')", command)
         return True
     
     def handle_system_commands(command):
-        if any(word in command.lower() for word in ["shutdown", "quit", "exit", "stop"]):
+        command = command.lower()
+        if any(word in command for word in _SHUTDOWN_WORDS):
             return True
         return False
+    
+    def new_vosk_recognizer():
+        return None
+    
+    def vosk_available():
+        return False
+    
+    SHUTDOWN_KEYWORDS = sorted(_SHUTDOWN_WORDS)
 
-# HTML Template for the web interface
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🎤 Siri Voice Assistant</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-        }
-        
-        .container {
-            background: white;
-            border-radius: 20px;
-            padding: 40px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            text-align: center;
-            max-width: 500px;
-            width: 100%;
-        }
-        
-        .title {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            color: #333;
-        }
-        
-        .subtitle {
-            color: #666;
-            margin-bottom: 30px;
-            font-size: 1.1em;
-        }
-        
-        .status {
-            padding: 15px;
-            border-radius: 10px;
-            margin-bottom: 30px;
-            font-weight: 600;
-        }
-        
-        .status.connected {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-        }
-        
-        .status.demo {
-            background: #fff3cd;
-            color: #856404;
-            border: 1px solid #ffeaa7;
-        }
-        
-        .voice-btn {
-            width: 120px;
-            height: 120px;
-            border-radius: 50%;
-            border: none;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            font-size: 3em;
-            cursor: pointer;
-            margin: 20px auto;
-            display: block;
-            transition: all 0.3s ease;
-            box-shadow: 0 10px 30px rgba(102, 126, 234, 0.4);
-        }
-        
-        .voice-btn:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.6);
-        }
-        
-        .voice-btn:active {
-            transform: translateY(-2px);
-        }
-        
-        .voice-btn.listening {
-            animation: pulse 1.5s infinite;
-            background: linear-gradient(135deg, #ff6b6b 0%, #ee5a24 100%);
-        }
-        
-        @keyframes pulse {
-            0% { box-shadow: 0 0 0 0 rgba(255, 107, 107, 0.7); }
-            70% { box-shadow: 0 0 0 20px rgba(255, 107, 107, 0); }
-            100% { box-shadow: 0 0 0 0 rgba(255, 107, 107, 0); }
-        }
-        
-        .input-container {
-            margin: 30px 0;
-        }
-        
-        .text-input {
-            width: 100%;
-            padding: 15px;
-            border: 2px solid #e0e0e0;
-            border-radius: 10px;
-            font-size: 1.1em;
-            margin-bottom: 15px;
-            outline: none;
-            transition: border-color 0.3s ease;
-        }
-        
-        .text-input:focus {
-            border-color: #667eea;
-        }
-        
-        .send-btn {
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 15px 30px;
-            border-radius: 10px;
-            font-size: 1.1em;
-            cursor: pointer;
-            transition: background 0.3s ease;
-        }
-        
-        .send-btn:hover {
-            background: #5a67d8;
-        }
-        
-        .response {
-            margin-top: 30px;
-            padding: 20px;
-            background: #f8f9fa;
-            border-radius: 10px;
-            border-left: 4px solid #667eea;
-            text-align: left;
-            font-size: 1.1em;
-            line-height: 1.6;
-            display: none;
-        }
-        
-        .examples {
-            margin-top: 30px;
-            text-align: left;
-        }
-        
-        .examples h3 {
-            color: #333;
-            margin-bottom: 15px;
-        }
-        
-        .examples ul {
-            list-style: none;
-            padding: 0;
-        }
-        
-        .examples li {
-            background: #f8f9fa;
-            padding: 10px 15px;
-            margin: 8px 0;
-            border-radius: 8px;
-            border-left: 3px solid #667eea;
-            cursor: pointer;
-            transition: background 0.3s ease;
-        }
-        
-        .examples li:hover {
-            background: #e9ecef;
-        }
-        
-        .footer {
-            margin-top: 30px;
-            color: #666;
-            font-size: 0.9em;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1 class="title">🎤 Siri Assistant</h1>
-        <p class="subtitle">Voice-controlled web interface</p>
-        
-        <div class="status {% if backend_available %}connected{% else %}demo{% endif %}">
-            {% if backend_available %}
-                ✅ Backend Connected - Full functionality available
-            {% else %}
-                🔧 Demo Mode - siri.py backend not connected
-            {% endif %}
-        </div>
-        
-        <button class="voice-btn" id="voiceBtn" title="Click and speak">🎤</button>
-        
-        <div class="input-container">
-            <input type="text" class="text-input" id="textInput" placeholder="Or type your command here..." />
-            <button class="send-btn" id="sendBtn">Send Command</button>
-        </div>
-        
-        <div class="response" id="response"></div>
-        
-        <div class="examples">
-            <h3>📝 Example Commands:</h3>
-            <ul>
-                <li onclick="executeCommand('Siri, open YouTube and find cooking videos')">🎬 "Siri, open YouTube and find cooking videos"</li>
-                <li onclick="executeCommand('Siri, open Spotify')">🎵 "Siri, open Spotify"</li>
-                <li onclick="executeCommand('Siri, open Chrome')">🌐 "Siri, open Chrome"</li>
-                <li onclick="executeCommand('Siri, help')">🆘 "Siri, help"</li>
-            </ul>
-        </div>
-        
-        <div class="footer">
-            <p>🔊 Click the microphone to start voice recognition</p>
-            <p>💬 Or type commands in the text box above</p>
-        </div>
-    </div>
-
-    <script>
-        const voiceBtn = document.getElementById('voiceBtn');
-        const textInput = document.getElementById('textInput');
-        const sendBtn = document.getElementById('sendBtn');
-        const responseDiv = document.getElementById('response');
-        
-        let recognition = null;
-        let isListening = false;
-        
-        // Initialize speech recognition if available
-        if ('webkitSpeechRecognition' in window) {
-            recognition = new webkitSpeechRecognition();
-            recognition.continuous = true;  // Keep listening
-            recognition.interimResults = true;  // Show real-time results
-            recognition.lang = 'en-US';
-            recognition.maxAlternatives = 1;
-            
-            recognition.onstart = function() {
-                isListening = true;
-                voiceBtn.classList.add('listening');
-                voiceBtn.innerHTML = '🔴';
-                voiceBtn.title = 'Click to stop listening';
-                showResponse('🎤 Always listening... Say your commands! Click microphone to stop.', 'info');
-            };
-            
-            recognition.onresult = function(event) {
-                let finalTranscript = '';
-                let interimTranscript = '';
-                
-                // Process all results
-                for (let i = event.resultIndex; i < event.results.length; i++) {
-                    const transcript = event.results[i][0].transcript;
-                    
-                    if (event.results[i].isFinal) {
-                        finalTranscript += transcript;
-                    } else {
-                        interimTranscript += transcript;
-                    }
-                }
-                
-                // Show interim results in real-time
-                if (interimTranscript) {
-                    textInput.value = finalTranscript + interimTranscript;
-                    showResponse('🎤 Listening: "' + (finalTranscript + interimTranscript) + '"', 'info');
-                }
-                
-                // When we have a final result, process it but KEEP listening
-                if (finalTranscript) {
-                    const command = finalTranscript.trim();
-                    textInput.value = command;
-                    
-                    if (command) {
-                        executeCommand(command);
-                        // Clear the text input after processing but keep listening
-                        setTimeout(() => {
-                            textInput.value = '';
-                            if (isListening) {
-                                showResponse('🎤 Ready for next command... (Click microphone to stop)', 'info');
-                            }
-                        }, 2000);
-                    }
-                }
-            };
-            
-            recognition.onerror = function(event) {
-                console.error('Speech recognition error:', event.error);
-                showResponse('❌ Speech recognition error: ' + event.error, 'error');
-                resetVoiceButton();
-            };
-            
-            recognition.onend = function() {
-                // If we're still supposed to be listening, restart automatically
-                if (isListening) {
-                    setTimeout(() => {
-                        if (isListening) {
-                            try {
-                                recognition.start();
-                            } catch (e) {
-                                console.log('Recognition restart failed:', e);
-                                resetVoiceButton();
-                            }
-                        }
-                    }, 100);
-                } else {
-                    resetVoiceButton();
-                }
-            };
-        } else {
-            voiceBtn.style.display = 'none';
-            showResponse('❌ Speech recognition not supported in this browser. Please use the text input.', 'error');
-        }
-        
-        // Voice button click handler
-        voiceBtn.addEventListener('click', function() {
-            if (!recognition) {
-                showResponse('❌ Speech recognition not available', 'error');
-                return;
-            }
-            
-            if (isListening) {
-                // Stop listening permanently
-                isListening = false; // Set this first to prevent auto-restart
-                recognition.stop();
-                showResponse('🛑 Stopping voice recognition...', 'info');
-            } else {
-                // Start permanent listening
-                textInput.value = ''; // Clear previous text
-                try {
-                    recognition.start();
-                } catch (e) {
-                    showResponse('❌ Could not start voice recognition. Try again.', 'error');
-                }
-            }
-        });
-        
-        // Send button click handler
-        sendBtn.addEventListener('click', function() {
-            const command = textInput.value.trim();
-            if (command) {
-                executeCommand(command);
-            }
-        });
-        
-        // Enter key handler for text input
-        textInput.addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                const command = textInput.value.trim();
-                if (command) {
-                    executeCommand(command);
-                }
-            }
-        });
-        
-        function resetVoiceButton() {
-            isListening = false;
-            voiceBtn.classList.remove('listening');
-            voiceBtn.innerHTML = '🎤';
-            voiceBtn.title = 'Click and speak';
-            showResponse('🔇 Voice recognition stopped. Click microphone to start listening again.', 'info');
-        }
-        
-        function executeCommand(command) {
-            showResponse('🔄 Processing command...', 'info');
-            
-            fetch('/api/command', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ command: command })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    showResponse(data.response, 'success');
-                } else {
-                    showResponse('❌ Error: ' + data.response, 'error');
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                showResponse('❌ Network error: Could not connect to server', 'error');
-            });
-        }
-        
-        function showResponse(message, type) {
-            responseDiv.innerHTML = message;
-            responseDiv.style.display = 'block';
-            
-            // Update styling based on response type
-            responseDiv.className = 'response';
-            if (type === 'error') {
-                responseDiv.style.borderLeftColor = '#dc3545';
-                responseDiv.style.backgroundColor = '#f8d7da';
-            } else if (type === 'success') {
-                responseDiv.style.borderLeftColor = '#28a745';
-                responseDiv.style.backgroundColor = '#d4edda';
-            } else {
-                responseDiv.style.borderLeftColor = '#667eea';
-                responseDiv.style.backgroundColor = '#f8f9fa';
-            }
-            
-            // Auto-scroll to response
-            responseDiv.scrollIntoView({ behavior: 'smooth' });
-        }
-        
-        // Test server connection on page load
-        fetch('/api/test')
-            .then(response => response.json())
-            .then(data => {
-                console.log('Server connection test:', data.message);
-            })
-            .catch(error => {
-                console.error('Server connection failed:', error);
-                showResponse('⚠️ Warning: Could not connect to server', 'error');
-            });
-    </script>
-</body>
-</html>
-"""
+_HELP_TEXT = "🆘 I can open apps and websites for you. Try: 'Siri, open YouTube and find cooking videos', 'Siri, open Spotify', or 'Siri, open Chrome'."
+
+BACKEND_RESPONSES = {
+    'youtube_search': "🎬 I've opened YouTube with your search. The videos should be loading now!",
+    'spotify': "🎵 Opening Spotify for you. Enjoy your music!",
+    'browser': "🌐 Opening your browser now.",
+    'help': _HELP_TEXT,
+    'opened': "✅ Command processed successfully! Check if the app/website opened.",
+    'unknown': "🤔 Please tell me what to open, or say 'help' for assistance.",
+}
+
+DEMO_RESPONSES = {
+    'youtube_search': "🎬 I would open YouTube and search for cooking videos! (Demo mode - siri.py not connected)",
+    'youtube': "🎬 I would open YouTube for you! (Demo mode - siri.py not connected)",
+    'spotify': "🎵 I would open Spotify and play your music! (Demo mode - siri.py not connected)",
+    'browser': "🌐 I would open Chrome browser for you! (Demo mode - siri.py not connected)",
+    'help': "🆘 I can help you open apps and websites. Try: 'Siri, open YouTube and find cooking videos' (Demo mode - your siri.py backend is not connected)",
+}
+
+# What the page needs to mirror classify_command (BACKEND_RULES) and handle_system_commands
+# for open commands, so it can confirm them without waiting for the reply
+CLIENT_RULES = {
+    'responses': BACKEND_RESPONSES,
+    'patterns': {
+        'open': keyword_pattern(_OPEN_GROUPS),
+        'youtube': keyword_pattern(('youtube',)),
+        'youtube_search': keyword_pattern(_YT_SEARCH_GROUPS),
+        'spotify': keyword_pattern(('spotify',)),
+        'browser': keyword_pattern(_BROWSER_GROUPS),
+        'help': keyword_pattern(('help',)),
+        'shutdown': r'\b(' + '|'.join(map(re.escape, SHUTDOWN_KEYWORDS)) + r')\b',
+    },
+}
+
+# Which optional server channels the page may use, so it doesn't probe for missing ones
+SERVER_FEATURES = {
+    'commandSocket': WEBSOCKETS_ENABLED,
+    'serverAsr': WEBSOCKETS_ENABLED and vosk_available(),
+}
+
+# Load the page from templates/index.html once at import; Flask's loader compiles and caches it
+_HOME_TEMPLATE = app.jinja_env.get_template('index.html')
+
+# backend_available is the only template input that varies, so the page has exactly two renderings;
+# produce both up front (a request context is only needed so url_for can build the static asset URLs)
+with app.test_request_context('/'):
+    _HOME_HTML = {
+        available: _HOME_TEMPLATE.render(backend_available=available, client_rules=CLIENT_RULES,
+                                          server_features=SERVER_FEATURES).encode('utf-8')
+        for available in (True, False)
+    }
+
+# The page is static after startup, so compress it once here rather than per request:
+# {(backend_available, encoding): body}
+_HOME_VARIANTS = {}
+for _available, _html in _HOME_HTML.items():
+    _HOME_VARIANTS[_available, 'gzip'] = gzip.compress(_html, 9)
+    _HOME_VARIANTS[_available, 'identity'] = _html
+    if brotli is not None:
+        _HOME_VARIANTS[_available, 'br'] = brotli.compress(_html, quality=11)
+# Preference order when the browser accepts several encodings equally
+_HOME_ENCODINGS = [enc for enc in ('br', 'gzip', 'identity') if (True, enc) in _HOME_VARIANTS]
+_HOME_ETAGS = {key: hashlib.md5(body).hexdigest() for key, body in _HOME_VARIANTS.items()}
+
+# The Siri backend blocks on TTS, app launches and the browser; run it off the request thread
+_backend_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="siri-backend")
+
+def _report_backend_error(future):
+    error = future.exception()
+    if error is not None:
+        log.error("❌ Error in Siri backend: %s", error)
+
+def run_in_background(func, *args):
+    """Run a blocking backend call on the worker pool, logging any failure"""
+    future = _backend_executor.submit(func, *args)
+    future.add_done_callback(_report_backend_error)
+    return future
+
+# Ordered (predicate over keyword groups, response key) rules - first match wins
+BACKEND_RULES = (
+    (lambda groups: 'youtube' in groups and groups & _YT_SEARCH_GROUPS, 'youtube_search'),
+    (lambda groups: 'spotify' in groups, 'spotify'),
+    (lambda groups: groups & _BROWSER_GROUPS, 'browser'),
+    (lambda groups: 'help' in groups, 'help'),
+)
+
+DEMO_RULES = (
+    (lambda groups: 'youtube' in groups and groups & _DEMO_YT_SEARCH_GROUPS, 'youtube_search'),
+    (lambda groups: 'youtube' in groups, 'youtube'),
+    (lambda groups: 'spotify' in groups, 'spotify'),
+    (lambda groups: groups & _DEMO_BROWSER_GROUPS, 'browser'),
+    (lambda groups: 'help' in groups, 'help'),
+)
+
+def match_rule(rules, groups, default=None):
+    """Response key of the first rule whose predicate matches the command's keyword groups"""
+    for predicate, kind in rules:
+        if predicate(groups):
+            return kind
+    return default
+
+@functools.lru_cache(maxsize=512)
+def classify_command(command):
+    """(runs_backend, response) for a normalized command
+    
+    Pure function of the command text, so repeated utterances ("siri help") skip
+    classification entirely; the open_command side effect stays in process_voice_command.
+    """
+    groups = command_groups(command)
+    
+    if not BACKEND_AVAILABLE:
+        return False, simulate_command(command, groups)
+    
+    # Check if it's an open/search command
+    if groups & _OPEN_GROUPS:
+        return True, BACKEND_RESPONSES[match_rule(BACKEND_RULES, groups, 'opened')]
+    return False, BACKEND_RESPONSES['help' if 'help' in groups else 'unknown']
 
 def process_voice_command(command):
     """Process voice command using your existing Siri backend"""
     try:
         command = command.lower().strip()
-        print(f"🎤 Processing command: '{command}'")
-        
-        if not BACKEND_AVAILABLE:
-            return simulate_command(command)
+        if log.isEnabledFor(logging.INFO):
+            log.info("🎤 Processing command: '%s'", command)
         
         # Check for system commands first
-        if handle_system_commands(command):
+        if BACKEND_AVAILABLE and handle_system_commands(command):
             return "I would shut down the voice assistant, but I'm running in web mode!"
         
-        # Check if it's an open/search command
-        if any(keyword in command for keyword in ["open", "play", "search", "find", "watch", "listen", "launch", "start"]):
+        runs_backend, response = classify_command(command)
+        if runs_backend:
             # Remove "siri" from command if present
             clean_command = command.replace("siri", "").strip()
             
-            # Process the command using your Siri backend
-            open_command(clean_command)
-            
-            # Generate appropriate response
-            if "youtube" in command and any(word in command for word in ["find", "search", "watch", "play"]):
-                return "🎬 I've opened YouTube with your search. The videos should be loading now!"
-            elif "spotify" in command:
-                return "🎵 Opening Spotify for you. Enjoy your music!"
-            elif any(app in command for app in ["chrome", "safari", "firefox"]):
-                return "🌐 Opening your browser now."
-            elif "help" in command:
-                return "🆘 I can open apps and websites for you. Try: 'Siri, open YouTube and find cooking videos', 'Siri, open Spotify', or 'Siri, open Chrome'."
-            else:
-                return "✅ Command processed successfully! Check if the app/website opened."
-        else:
-            if "help" in command:
-                return "🆘 I can open apps and websites for you. Try: 'Siri, open YouTube and find cooking videos', 'Siri, open Spotify', or 'Siri, open Chrome'."
-            else:
-                return "🤔 Please tell me what to open, or say 'help' for assistance."
+            # Process the command using your Siri backend (in the background - the
+            # response doesn't depend on it, so don't hold the request open)
+            run_in_background(open_command, clean_command)
+        return response
                 
     except Exception as e:
-        print(f"❌ Error processing command: {e}")
+        log.error("❌ Error processing command: %s", e)
         return f"❌ Sorry, I encountered an error: {str(e)}"
 
-def simulate_command(command):
-    """Simulate command processing when Siri backend is not available"""
-    command = command.lower()
+def simulate_command(command, groups):
+    """Simulate command processing when Siri backend is not available
     
-    if "youtube" in command:
-        if any(word in command for word in ["find", "search", "watch", "cooking", "video"]):
-            return "🎬 I would open YouTube and search for cooking videos! (Demo mode - siri.py not connected)"
-        else:
-            return "🎬 I would open YouTube for you! (Demo mode - siri.py not connected)"
-    elif "spotify" in command:
-        return "🎵 I would open Spotify and play your music! (Demo mode - siri.py not connected)"
-    elif "chrome" in command or "browser" in command:
-        return "🌐 I would open Chrome browser for you! (Demo mode - siri.py not connected)"
-    elif "help" in command:
-        return "🆘 I can help you open apps and websites. Try: 'Siri, open YouTube and find cooking videos' (Demo mode - your siri.py backend is not connected)"
-    else:
+    Takes the already-normalized command and its keyword groups from classify_command.
+    """
+    kind = match_rule(DEMO_RULES, groups)
+    if kind is None:
         return f"🤖 I heard: '{command}'. I would process this command if siri.py was connected! (Demo mode)"
+    return DEMO_RESPONSES[kind]
 
 @app.route('/')
 def home():
     """Serve the main web interface"""
-    return render_template_string(HTML_TEMPLATE, backend_available=BACKEND_AVAILABLE)
+    encoding = request.accept_encodings.best_match(_HOME_ENCODINGS, default='identity')
+    variant = (BACKEND_AVAILABLE, encoding)
+    response = Response(_HOME_VARIANTS[variant], mimetype='text/html')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    response.set_etag(_HOME_ETAGS[variant])
+    # Answers If-None-Match with an empty 304 when the browser already has this page
+    return response.make_conditional(request)
 
-@app.route('/api/command', methods=['POST'])
-def handle_command():
-    """Handle voice commands from the web interface"""
+def command_result(data):
+    """Run one command payload ({'command': ...}) and build the JSON reply"""
     try:
-        data = request.get_json()
-        command = data.get('command', '')
+        command = (data or {}).get('command', '')
         
         if not command:
-            return jsonify({
+            return {
                 'success': False,
                 'response': 'No command received'
-            })
+            }
         
-        print(f"📨 Received command from web: {command}")
+        if log.isEnabledFor(logging.INFO):
+            log.info("📨 Received command from web: %s", command)
         
         # Process the command
         response = process_voice_command(command)
         
-        return jsonify({
+        return {
             'success': True,
             'response': response
-        })
+        }
         
     except Exception as e:
-        print(f"❌ Error in handle_command: {e}")
-        return jsonify({
+        log.error("❌ Error in handle_command: %s", e)
+        return {
             'success': False,
             'response': f'Server error: {str(e)}'
-        })
+        }
+
+@app.route('/api/command', methods=['POST'])
+def handle_command():
+    """Handle voice commands from the web interface"""
+    # force: beacons from the page arrive as text/plain
+    return jsonify(command_result(request.get_json(force=True, silent=True)))
+
+if WEBSOCKETS_ENABLED:
+    sock = Sock(app)
+    
+    @sock.route('/ws')
+    def command_socket(ws):
+        """Persistent channel for commands: one JSON frame in, one JSON reply out"""
+        while True:
+            message = ws.receive()
+            try:
+                data = app.json.loads(message)
+            except (TypeError, ValueError):
+                data = None
+            ws.send(app.json.dumps(command_result(data)))
+    
+    @sock.route('/asr')
+    def asr_socket(ws):
+        """Server-side speech recognition: 16kHz 16-bit mono PCM frames in,
+        {'partial': ...} / {'text': ...} JSON frames out"""
+        rec = new_vosk_recognizer()
+        if rec is None:
+            ws.send(app.json.dumps({'error': 'Server-side speech recognition is not available'}))
+            return
+        
+        last_partial = ''
+        while True:
+            frame = ws.receive()
+            if not isinstance(frame, bytes):
+                continue
+            
+            if rec.AcceptWaveform(frame):
+                # End of an utterance - the client runs it like a typed command
+                text = app.json.loads(rec.Result()).get('text', '')
+                last_partial = ''
+                if text:
+                    ws.send(app.json.dumps({'text': text}))
+            else:
+                partial = app.json.loads(rec.PartialResult()).get('partial', '')
+                if partial and partial != last_partial:
+                    last_partial = partial
+                    ws.send(app.json.dumps({'partial': partial}))
+
+# The connectivity check reply is fixed for the life of the process - serialize it once
+_TEST_BODY = app.json.dumps({
+    'success': True,
+    'message': '✅ Siri web server is running! Backend status: '
+               + ("Connected to siri.py" if BACKEND_AVAILABLE else "Demo Mode (siri.py not found)")
+}).encode('utf-8')
+_TEST_ETAG = hashlib.md5(_TEST_BODY).hexdigest()
 
 @app.route('/api/test')
 def test_connection():
     """Test endpoint to check server connectivity"""
-    backend_status = "Connected to siri.py" if BACKEND_AVAILABLE else "Demo Mode (siri.py not found)"
-    return jsonify({
-        'success': True,
-        'message': f'✅ Siri web server is running! Backend status: {backend_status}'
-    })
+    response = Response(_TEST_BODY, mimetype='application/json')
+    # Let the page-load check revalidate each time, but with an empty 304 instead of the body
+    response.headers['Cache-Control'] = 'no-cache'
+    response.set_etag(_TEST_ETAG)
+    return response.make_conditional(request)
+
+def run_flask_server(debug):
+    """Flask's built-in server, speaking HTTP/1.1 so browsers can reuse the connection"""
+    from werkzeug.serving import WSGIRequestHandler
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    app.run(host=HOST, port=PORT, debug=debug, use_reloader=False)
+
+def serve_production():
+    """Serve in-process with waitress (gunicorn, when available, took over at import)"""
+    if SERVER != 'waitress':
+        print("⚠️  gunicorn/waitress not installed - falling back to Flask's built-in server")
+        run_flask_server(debug=False)
+        return
+    from waitress import serve
+    # waitress threads share the GIL; they still help because the backend mostly
+    # waits on subprocess/webbrowser I/O
+    serve(app, host=HOST, port=PORT, threads=8, connection_limit=1000)
 
 def main():
     """Main function to start the Flask server"""
+    # Werkzeug's debugger wraps every request, so only enable it when asked to
+    dev_mode = SERVER == 'dev'
+    
     print("🚀 Starting Siri Voice Assistant Web Server...")
-    print("🌐 Server will run on: http://127.0.0.1:8080")
-    print("📱 Open http://127.0.0.1:8080 in your browser to use the web interface")
+    print(f"🌐 Server will run on: http://{HOST}:{PORT}")
+    print(f"📱 Open http://{HOST}:{PORT} in your browser to use the web interface")
     print("🎤 Make sure to allow microphone access when prompted")
     
     if BACKEND_AVAILABLE:
@@ -577,9 +472,12 @@ def main():
     print("   - 'Siri, help'")
     print("\n🔧 Press Ctrl+C to stop the server\n")
     
-    # Run Flask app
+    # Run Flask app (the debug dev server only with --dev or SIRI_DEV=1)
     try:
-        app.run(host='127.0.0.1', port=8080, debug=True, use_reloader=False)
+        if dev_mode:
+            run_flask_server(debug=True)
+        else:
+            serve_production()
     except KeyboardInterrupt:
         print("\n👋 Shutting down Siri web server...")
     except Exception as e:
@@ -0,0 +1,38 @@
+// Captures mono microphone audio, downsamples it to 16 kHz and posts 40 ms
+// chunks of 16-bit PCM (the format the server-side recognizer expects)
+const TARGET_RATE = 16000;
+const CHUNK_SAMPLES = 640;  // 40 ms at 16 kHz
+
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+    constructor() {
+        super();
+        this.ratio = sampleRate / TARGET_RATE;
+        this.position = 0;
+        this.chunk = new Int16Array(CHUNK_SAMPLES);
+        this.filled = 0;
+    }
+    
+    process(inputs) {
+        const input = inputs[0] && inputs[0][0];
+        if (!input) {
+            return true;
+        }
+        
+        // Nearest-sample decimation is plenty for speech recognition
+        while (this.position < input.length) {
+            const sample = Math.max(-1, Math.min(1, input[Math.floor(this.position)]));
+            this.chunk[this.filled++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+            
+            if (this.filled === CHUNK_SAMPLES) {
+                this.port.postMessage(this.chunk.buffer, [this.chunk.buffer]);
+                this.chunk = new Int16Array(CHUNK_SAMPLES);
+                this.filled = 0;
+            }
+            this.position += this.ratio;
+        }
+        this.position -= input.length;
+        return true;
+    }
+}
+
+registerProcessor('pcm-capture', PcmCaptureProcessor);
@@ -0,0 +1,432 @@
+const voiceBtn = document.getElementById('voiceBtn');
+const textInput = document.getElementById('textInput');
+const sendBtn = document.getElementById('sendBtn');
+const responseDiv = document.getElementById('response');
+
+let recognition = null;
+let isListening = false;
+
+// Optional server channels (WebSockets need flask-sock and a server that can upgrade)
+const serverFeatures = JSON.parse(document.getElementById('serverFeatures').textContent);
+
+// Fallback for browsers without webkitSpeechRecognition: stream PCM to the server's /asr socket
+const serverAsrSupported = serverFeatures.serverAsr &&
+    !!(navigator.mediaDevices && window.AudioWorkletNode && 'WebSocket' in window);
+let asrSocket = null;
+let asrContext = null;
+let asrStream = null;
+
+// Initialize speech recognition if available
+if ('webkitSpeechRecognition' in window) {
+    recognition = new webkitSpeechRecognition();
+    recognition.continuous = true;  // Keep listening
+    recognition.interimResults = true;  // Show real-time results
+    recognition.lang = 'en-US';
+    recognition.maxAlternatives = 1;
+    
+    recognition.onstart = function() {
+        isListening = true;
+        voiceBtn.classList.add('listening');
+        voiceBtn.innerHTML = '🔴';
+        voiceBtn.title = 'Click to stop listening';
+        showResponse('🎤 Always listening... Say your commands! Click microphone to stop.', 'info');
+    };
+    
+    recognition.onresult = function(event) {
+        let finalTranscript = '';
+        let interimTranscript = '';
+        
+        // Process all results
+        for (let i = event.resultIndex; i < event.results.length; i++) {
+            const transcript = event.results[i][0].transcript;
+            
+            if (event.results[i].isFinal) {
+                finalTranscript += transcript;
+            } else {
+                interimTranscript += transcript;
+            }
+        }
+        
+        // Show interim results in real-time
+        if (interimTranscript) {
+            showInterim(finalTranscript + interimTranscript);
+        }
+        
+        // When we have a final result, process it but KEEP listening
+        if (finalTranscript) {
+            const command = finalTranscript.trim();
+            cancelInterim();
+            textInput.value = command;
+            
+            if (command) {
+                scheduleVoiceCommand(command);
+                // Clear the text input after processing but keep listening
+                setTimeout(() => {
+                    textInput.value = '';
+                    if (isListening) {
+                        showResponse('🎤 Ready for next command... (Click microphone to stop)', 'info');
+                    }
+                }, 2000);
+            }
+        }
+    };
+    
+    recognition.onerror = function(event) {
+        console.error('Speech recognition error:', event.error);
+        showResponse('❌ Speech recognition error: ' + event.error, 'error');
+        resetVoiceButton();
+    };
+    
+    recognition.onend = function() {
+        // If we're still supposed to be listening, restart automatically
+        if (isListening) {
+            setTimeout(() => {
+                if (isListening) {
+                    try {
+                        recognition.start();
+                    } catch (e) {
+                        console.log('Recognition restart failed:', e);
+                        resetVoiceButton();
+                    }
+                }
+            }, 100);
+        } else {
+            resetVoiceButton();
+        }
+    };
+} else if (!serverAsrSupported) {
+    voiceBtn.style.display = 'none';
+    showResponse('❌ Speech recognition not supported in this browser. Please use the text input.', 'error');
+}
+
+// Voice button click handler
+voiceBtn.addEventListener('click', function() {
+    if (!recognition) {
+        if (!serverAsrSupported) {
+            showResponse('❌ Speech recognition not available', 'error');
+        } else if (isListening) {
+            stopServerAsr();
+        } else {
+            startServerAsr();
+        }
+        return;
+    }
+    
+    if (isListening) {
+        // Stop listening permanently
+        isListening = false; // Set this first to prevent auto-restart
+        recognition.stop();
+        showResponse('🛑 Stopping voice recognition...', 'info');
+    } else {
+        // Start permanent listening
+        textInput.value = ''; // Clear previous text
+        try {
+            recognition.start();
+        } catch (e) {
+            showResponse('❌ Could not start voice recognition. Try again.', 'error');
+        }
+    }
+});
+
+// Send button click handler
+sendBtn.addEventListener('click', function() {
+    const command = textInput.value.trim();
+    if (command) {
+        executeCommand(command);
+    }
+});
+
+// Enter key handler for text input
+textInput.addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        const command = textInput.value.trim();
+        if (command) {
+            executeCommand(command);
+        }
+    }
+});
+
+async function startServerAsr() {
+    textInput.value = '';
+    try {
+        asrStream = await navigator.mediaDevices.getUserMedia({ audio: { channelCount: 1 } });
+        asrContext = new AudioContext();
+        await asrContext.audioWorklet.addModule('/static/pcm-worklet.js');
+    } catch (e) {
+        console.error('Microphone setup failed:', e);
+        stopServerAsr('❌ Could not access the microphone');
+        return;
+    }
+    
+    const scheme = location.protocol === 'https:' ? 'wss://' : 'ws://';
+    asrSocket = new WebSocket(scheme + location.host + '/asr');
+    asrSocket.binaryType = 'arraybuffer';
+    
+    asrSocket.onopen = function() {
+        // The worklet downsamples to 16 kHz and posts 40 ms Int16 PCM chunks
+        const source = asrContext.createMediaStreamSource(asrStream);
+        const capture = new AudioWorkletNode(asrContext, 'pcm-capture');
+        capture.port.onmessage = function(event) {
+            if (asrSocket && asrSocket.readyState === WebSocket.OPEN) {
+                asrSocket.send(event.data);
+            }
+        };
+        source.connect(capture);
+        // Outputs silence, but keeps the graph pulling audio through the worklet
+        capture.connect(asrContext.destination);
+        
+        isListening = true;
+        voiceBtn.classList.add('listening');
+        voiceBtn.innerHTML = '🔴';
+        voiceBtn.title = 'Click to stop listening';
+        showResponse('🎤 Always listening (server recognition)... Click microphone to stop.', 'info');
+    };
+    
+    asrSocket.onmessage = function(event) {
+        const data = JSON.parse(event.data);
+        if (data.error) {
+            stopServerAsr('❌ ' + data.error);
+        } else if (data.partial) {
+            showInterim(data.partial);
+        } else if (data.text) {
+            cancelInterim();
+            textInput.value = data.text;
+            scheduleVoiceCommand(data.text);
+        }
+    };
+    
+    asrSocket.onerror = function(event) {
+        console.error('Speech recognition socket error:', event);
+    };
+    
+    // Only fires for closes we didn't ask for - release the mic whether or not it ever opened
+    asrSocket.onclose = function() {
+        stopServerAsr(isListening
+            ? '❌ Lost connection to server speech recognition'
+            : '❌ Could not connect to server speech recognition');
+    };
+}
+
+function stopServerAsr(errorMessage) {
+    if (asrSocket) {
+        asrSocket.onclose = null;
+        asrSocket.close();
+        asrSocket = null;
+    }
+    if (asrStream) {
+        asrStream.getTracks().forEach(track => track.stop());
+        asrStream = null;
+    }
+    if (asrContext) {
+        asrContext.close();
+        asrContext = null;
+    }
+    resetVoiceButton();
+    // After the reset, which would otherwise overwrite the reason with "stopped"
+    if (errorMessage) {
+        showResponse(errorMessage, 'error');
+    }
+}
+
+function resetVoiceButton() {
+    isListening = false;
+    voiceBtn.classList.remove('listening');
+    voiceBtn.innerHTML = '🎤';
+    voiceBtn.title = 'Click and speak';
+    showResponse('🔇 Voice recognition stopped. Click microphone to start listening again.', 'info');
+}
+
+// One persistent WebSocket for commands (falls back to POST /api/command if unavailable)
+let commandSocket = null;
+
+function connectCommandSocket() {
+    if (!serverFeatures.commandSocket || !('WebSocket' in window)) {
+        return;
+    }
+    const scheme = location.protocol === 'https:' ? 'wss://' : 'ws://';
+    const ws = new WebSocket(scheme + location.host + '/ws');
+    
+    ws.onopen = function() {
+        commandSocket = ws;
+    };
+    
+    ws.onmessage = function(event) {
+        handleCommandResult(JSON.parse(event.data));
+    };
+    
+    ws.onclose = function() {
+        // Only keep retrying if the server supported the socket in the first place
+        const wasOpen = commandSocket === ws;
+        commandSocket = null;
+        if (wasOpen) {
+            setTimeout(connectCommandSocket, 2000);
+        }
+    };
+}
+
+// Interim transcripts arrive many times a second - only touch the DOM once per frame
+let pendingInterim = null;
+let interimFrame = 0;
+
+function showInterim(text) {
+    pendingInterim = text;
+    if (!interimFrame) {
+        interimFrame = requestAnimationFrame(function() {
+            interimFrame = 0;
+            if (pendingInterim !== null) {
+                textInput.value = pendingInterim;
+                showResponse('🎤 Listening: "' + pendingInterim + '"', 'info');
+                pendingInterim = null;
+            }
+        });
+    }
+}
+
+function cancelInterim() {
+    pendingInterim = null;
+    if (interimFrame) {
+        cancelAnimationFrame(interimFrame);
+        interimFrame = 0;
+    }
+}
+
+// Recognizers can emit several finals for one phrase - settle for 300 ms before sending
+const VOICE_DEBOUNCE_MS = 300;
+let voiceCommandTimer = null;
+
+function scheduleVoiceCommand(command) {
+    clearTimeout(voiceCommandTimer);
+    voiceCommandTimer = setTimeout(function() {
+        voiceCommandTimer = null;
+        executeCommand(command);
+    }, VOICE_DEBOUNCE_MS);
+}
+
+// ...and the same command repeated within this window is treated as a double-fire
+const DUPLICATE_WINDOW_MS = 1500;
+let lastCommand = '';
+let lastCommandTime = 0;
+
+// Server response strings and keyword patterns for side-effect commands;
+// only embedded when siri.py is connected
+const commandRulesEl = document.getElementById('commandRules');
+const commandRules = commandRulesEl ? JSON.parse(commandRulesEl.textContent) : null;
+const commandPatterns = {};
+if (commandRules) {
+    for (const name in commandRules.patterns) {
+        commandPatterns[name] = new RegExp(commandRules.patterns[name]);
+    }
+}
+
+function optimisticResponse(command) {
+    if (!commandRules || !navigator.sendBeacon) {
+        return null;
+    }
+    const text = command.toLowerCase().trim();
+    // Help, shutdown and unknown commands still wait for the server's answer
+    if (!commandPatterns.open.test(text) || commandPatterns.help.test(text) || commandPatterns.shutdown.test(text)) {
+        return null;
+    }
+    if (commandPatterns.youtube.test(text) && commandPatterns.youtube_search.test(text)) {
+        return commandRules.responses.youtube_search;
+    }
+    if (commandPatterns.spotify.test(text)) {
+        return commandRules.responses.spotify;
+    }
+    if (commandPatterns.browser.test(text)) {
+        return commandRules.responses.browser;
+    }
+    return commandRules.responses.opened;
+}
+
+// Queue a command without waiting for the reply -> false if the browser won't take it
+function sendCommandBeacon(command) {
+    try {
+        // text/plain is CORS-safelisted; Chromium has thrown on application/json beacons
+        return navigator.sendBeacon('/api/command', new Blob([JSON.stringify({ command: command })], { type: 'text/plain' }));
+    } catch (e) {
+        console.log('sendBeacon failed, falling back to fetch:', e);
+        return false;
+    }
+}
+
+function executeCommand(command) {
+    const now = Date.now();
+    if (command === lastCommand && now - lastCommandTime < DUPLICATE_WINDOW_MS) {
+        return;
+    }
+    lastCommand = command;
+    lastCommandTime = now;
+    
+    // Open/launch commands only need the server for their side effect - confirm locally
+    // and hand the command off without waiting for the round trip
+    const localResponse = optimisticResponse(command);
+    if (localResponse && sendCommandBeacon(command)) {
+        showResponse(localResponse, 'success');
+        return;
+    }
+    
+    showResponse('🔄 Processing command...', 'info');
+    
+    if (commandSocket && commandSocket.readyState === WebSocket.OPEN) {
+        commandSocket.send(JSON.stringify({ command: command }));
+        return;
+    }
+    
+    fetch('/api/command', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ command: command }),
+        keepalive: true
+    })
+    .then(response => response.json())
+    .then(handleCommandResult)
+    .catch(error => {
+        console.error('Error:', error);
+        showResponse('❌ Network error: Could not connect to server', 'error');
+    });
+}
+
+function handleCommandResult(data) {
+    if (data.success) {
+        showResponse(data.response, 'success');
+    } else {
+        showResponse('❌ Error: ' + data.response, 'error');
+    }
+}
+
+function showResponse(message, type) {
+    responseDiv.innerHTML = message;
+    responseDiv.style.display = 'block';
+    
+    // Update styling based on response type
+    responseDiv.className = 'response';
+    if (type === 'error') {
+        responseDiv.style.borderLeftColor = '#dc3545';
+        responseDiv.style.backgroundColor = '#f8d7da';
+    } else if (type === 'success') {
+        responseDiv.style.borderLeftColor = '#28a745';
+        responseDiv.style.backgroundColor = '#d4edda';
+    } else {
+        responseDiv.style.borderLeftColor = '#667eea';
+        responseDiv.style.backgroundColor = '#f8f9fa';
+    }
+    
+    // Auto-scroll to response
+    responseDiv.scrollIntoView({ behavior: 'smooth' });
+}
+
+connectCommandSocket();
+
+// Test server connection on page load
+fetch('/api/test')
+    .then(response => response.json())
+    .then(data => {
+        console.log('Server connection test:', data.message);
+    })
+    .catch(error => {
+        console.error('Server connection failed:', error);
+        showResponse('⚠️ Warning: Could not connect to server', 'error');
+    });
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers, e.g.:
+    gunicorn -w 1 -k gthread --threads 64 --keep-alive 75 -b 127.0.0.1:8080 wsgi:app
+
+The /ws and /asr WebSocket routes are registered for this import path, so use a server
+that can hand flask-sock the raw socket (gunicorn's gthread worker does; waitress doesn't).
+"""
+
+from siri_web_server import app